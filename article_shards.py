@@ -0,0 +1,293 @@
+"""
+Sharded article store with parallel fan-out retrieval
+- Articles are appended to a mutable head shard; once it holds shard_size
+  articles it is sealed on a background thread: frozen and compacted into an
+  inverted index, searched linearly until then
+- Sealed shards only rescore candidates from their index (keyword substring
+  hits, recent fetches, the earliest authoritative-source articles) instead
+  of every article
+- Queries fan out to all shards in parallel and the per-shard top-k lists
+  are combined with a k-way merge
+- A per-query deadline returns the best partial result if a shard is slow;
+  shards are searched newest first, so the freshest articles are kept
+"""
+import heapq
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import islice
+
+SHARD_SIZE = 10000        # Articles per shard before the head is sealed
+SHARD_WORKERS = 4         # Threads used to search shards in parallel
+LOOKUP_CACHE_SIZE = 512   # Keyword lookups remembered per sealed shard
+DEADLINE_CHECK_EVERY = 64 # Articles scored between deadline checks
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def article_text(article):
+    return f"{article.get('title', '')} {article.get('description', '')}".lower()
+
+
+class Query:
+    """Everything a shard needs to score one question"""
+
+    def __init__(self, question_lower, keywords, terms, now, predicate=None):
+        self.question_lower = question_lower
+        self.keywords = keywords
+        self.predicate = predicate
+        self.now = now
+        # Only the longest word of a multi-word term needs an index lookup:
+        # any article containing the term contains that word inside one token
+        self.lookups = sorted({max(TOKEN_RE.findall(term.lower()), key=len)
+                               for term in terms if TOKEN_RE.search(term)})
+
+
+class Shard:
+    """A run of consecutive articles; searched linearly until sealed and indexed"""
+
+    def __init__(self, shard_id):
+        self.shard_id = shard_id
+        self.articles = []
+        self.seqs = []
+        self.sealed = False
+        self.seal_ms = None
+        self._lookup_cache = {}
+        self._cache_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.articles)
+
+    def add(self, seq, article):
+        self.articles.append(article)
+        self.seqs.append(seq)
+
+    def seal(self, auth_terms, fetch_time):
+        """Freeze the shard and build its compacted index"""
+        started = time.perf_counter()
+        articles = tuple(self.articles)
+        postings = {}
+        authoritative = array('I')
+        timeline = []
+        for i, article in enumerate(articles):
+            for token in set(TOKEN_RE.findall(article_text(article))):
+                ids = postings.get(token)
+                if ids is None:
+                    ids = postings[token] = array('I')
+                ids.append(i)
+            source = article.get('source', '').lower()
+            if any(auth in source for auth in auth_terms):
+                authoritative.append(i)
+            fetched = fetch_time(article)
+            if fetched is not None:
+                timeline.append((fetched, i))
+
+        # One newline-separated blob of the vocabulary lets a single regex
+        # scan find every token containing a keyword as a substring
+        vocab = sorted(postings)
+        offsets = array('I')
+        position = 0
+        for token in vocab:
+            offsets.append(position)
+            position += len(token) + 1
+        timeline.sort()
+
+        self._vocab_blob = "\n".join(vocab)
+        self._vocab_offsets = offsets
+        self._postings = [postings[token] for token in vocab]
+        self._authoritative = authoritative
+        self._times = [fetched for fetched, _ in timeline]
+        self._times_ids = array('I', (i for _, i in timeline))
+        self.articles = articles
+        self.seqs = array('Q', self.seqs)
+        self.seal_ms = (time.perf_counter() - started) * 1000
+        self.sealed = True
+
+    def _lookup(self, word):
+        with self._cache_lock:
+            ids = self._lookup_cache.get(word)
+        if ids is not None:
+            return ids
+        tokens = set()
+        for match in re.finditer(re.escape(word), self._vocab_blob):
+            tokens.add(bisect_right(self._vocab_offsets, match.start()) - 1)
+        ids = set()
+        for token in tokens:
+            ids.update(self._postings[token])
+        ids = frozenset(ids)
+        with self._cache_lock:
+            if len(self._lookup_cache) >= LOOKUP_CACHE_SIZE:
+                self._lookup_cache.clear()
+            self._lookup_cache[word] = ids
+        return ids
+
+    def candidates(self, query, recency_cutoff):
+        """Articles with a keyword hit or a recency boost; a superset of the real matches"""
+        ids = set()
+        for word in query.lookups:
+            ids.update(self._lookup(word))
+        if recency_cutoff is not None:
+            ids.update(self._times_ids[bisect_left(self._times, recency_cutoff):])
+        return ids
+
+    def search(self, query, limit, score_fn, recency_cutoff, stop_at=None):
+        """Top results of this shard as (-score, seq, article), best first
+
+        Returns (results, complete). Past stop_at (time.monotonic()) the scan stops
+        and the best results so far are returned with complete=False; articles are
+        scanned newest first so those are the ones kept.
+        """
+        if stop_at is not None and time.monotonic() >= stop_at:
+            return [], False
+
+        articles, seqs = self.articles, self.seqs
+        if self.sealed:
+            candidates = self.candidates(query, recency_cutoff)
+            ids = sorted(candidates, reverse=True)
+        else:
+            # Head shard: snapshot the length, appends may continue meanwhile
+            ids = range(len(seqs) - 1, -1, -1)
+
+        results = []
+
+        def best():
+            return heapq.nsmallest(limit, results, key=lambda result: result[:2])
+
+        def score(i):
+            article = articles[i]
+            if query.predicate is not None and not query.predicate(article):
+                return False
+            value = score_fn(article, query.question_lower, query.keywords, query.now)
+            if value > 0:
+                results.append((-value, seqs[i], article))
+            return value > 0
+
+        for n, i in enumerate(ids, 1):
+            score(i)
+            if stop_at is not None and n % DEADLINE_CHECK_EVERY == 0 and time.monotonic() >= stop_at:
+                return best(), False
+
+        if self.sealed:
+            # Articles matched only by their source all score the same, so the
+            # earliest `limit` of them are the only ones that can make the top k
+            found = 0
+            for i in self._authoritative:
+                if found >= limit:
+                    break
+                if i not in candidates and score(i):
+                    found += 1
+        return best(), True
+
+
+class ShardedArticleStore:
+    """Append-only article store split into shards that are searched in parallel
+
+    score_fn(article, question_lower, keywords, now) is the relevance function;
+    auth_terms and recency_window tell sealed shards which articles score without
+    a keyword hit, so their indexes never drop a real match.
+    """
+
+    def __init__(self, score_fn, fetch_time, auth_terms=(), recency_window=None,
+                 shard_size=SHARD_SIZE, workers=SHARD_WORKERS):
+        self.score_fn = score_fn
+        self.fetch_time = fetch_time
+        self.auth_terms = tuple(auth_terms)
+        self.recency_window = recency_window
+        self.shard_size = shard_size
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._shards = [Shard(0)]
+        self._executor = None
+        self._sealer = None
+        self._seals = []
+        self.count = 0
+        self.queries = 0
+        self.partial_queries = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, article):
+        """Append to the head shard; a full head is handed to the sealer thread"""
+        with self._lock:
+            head = self._shards[-1]
+            head.add(self.count, article)
+            self.count += 1
+            if len(head) < self.shard_size:
+                return
+            self._shards.append(Shard(head.shard_id + 1))
+            # Callers hold the app's store lock, so never seal inline. The shard
+            # stays searchable by linear scan until `sealed` flips.
+            if self._sealer is None:
+                self._sealer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shard-seal")
+            self._seals = [seal for seal in self._seals if not seal.done()]
+            self._seals.append(self._sealer.submit(head.seal, self.auth_terms, self.fetch_time))
+
+    def flush(self):
+        """Wait until every full shard is sealed"""
+        with self._lock:
+            seals = list(self._seals)
+        wait(seals)
+        for seal in seals:
+            seal.result()
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix="shard-search")
+        return self._executor
+
+    def search(self, query, limit=10, deadline=None):
+        """Best `limit` articles across all shards, ordered like a linear scan
+
+        Returns (articles, partial); partial is True when the deadline (seconds)
+        passed before every shard finished. Shards are submitted newest first so
+        a missed deadline drops the oldest articles, not the freshest.
+        """
+        with self._lock:
+            shards = list(self._shards)
+        recency_cutoff = query.now - self.recency_window if self.recency_window else None
+        stop_at = time.monotonic() + deadline if deadline is not None else None
+
+        if len(shards) == 1:
+            results, complete = shards[0].search(query, limit, self.score_fn, recency_cutoff, stop_at)
+            per_shard = [results]
+            partial = not complete
+        else:
+            futures = [self._pool().submit(shard.search, query, limit, self.score_fn, recency_cutoff, stop_at)
+                       for shard in reversed(shards)]
+            done, pending = wait(futures, timeout=deadline)
+            for future in pending:
+                future.cancel()
+            answered = [future.result() for future in futures if future in done]
+            per_shard = [results for results, _ in answered]
+            partial = bool(pending) or not all(complete for _, complete in answered)
+
+        self.queries += 1
+        if partial:
+            self.partial_queries += 1
+        merged = heapq.merge(*per_shard, key=lambda result: result[:2])
+        return [article for _, _, article in islice(merged, limit)], partial
+
+    def stats(self):
+        """Shard layout and query counters, for the status endpoint"""
+        with self._lock:
+            shards = list(self._shards)
+        sealed = [shard for shard in shards if shard.sealed]
+        return {
+            "articles": self.count,
+            "shards": len(shards),
+            "sealed_shards": len(sealed),
+            "pending_seals": len(shards) - 1 - len(sealed),
+            "head_shard_articles": len(shards[-1]),
+            "shard_size": self.shard_size,
+            "workers": self.workers,
+            "last_seal_ms": round(sealed[-1].seal_ms, 1) if sealed else None,
+            "queries": self.queries,
+            "partial_queries": self.partial_queries
+        }
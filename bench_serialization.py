@@ -0,0 +1,137 @@
+"""
+Serialization benchmark: bytes on the wire and CPU per request
+- Compares the previous jsonify-per-request path with prebuilt fragments
+- Covers /api/articles, /api/stats and /v1/pw_ai_answer responses
+- Usage: python bench_serialization.py [articles] [iterations]
+"""
+import contextlib
+import io
+import sys
+import time
+import simple_app
+from flask import jsonify
+from simple_app import app, news_articles, store_articles, answer_response
+from fast_json import FAST_JSON_AVAILABLE, BROTLI_AVAILABLE
+
+
+def seed_articles(count):
+    """Fill the store with realistic-sized synthetic articles"""
+    topics = ["technology", "business", "science"]
+    sources = ["Reuters", "Bloomberg", "TechCrunch", "BBC News", "The Verge", "Wired", "CNBC"]
+    for i in range(count):
+        with contextlib.redirect_stdout(io.StringIO()):
+            store_articles([{
+                "title": f"Company {i} announces quarterly earnings beat as AI demand surges across cloud market",
+                "description": "The company said revenue rose sharply on strong demand for machine learning "
+                               "infrastructure, while analysts pointed to expanding margins and new product launches. " * 2,
+                "content": "Full article body " * 40,
+                "url": f"https://news.example.com/{topics[i % 3]}/2024/article-{i}",
+                "source": {"name": sources[i % len(sources)]},
+                "publishedAt": "2024-05-01T12:00:00Z"
+            }], topics[i % 3])
+
+
+def legacy_articles():
+    recent = news_articles[-10:] if len(news_articles) > 10 else news_articles
+    return jsonify({
+        "articles": [
+            {
+                "title": a['title'],
+                "source": a['source'],
+                "topic": a['topic'],
+                "category": a.get('category', 'general'),
+                "published_at": a['published_at'],
+                "url": a['url']
+            }
+            for a in recent
+        ],
+        "total": len(news_articles)
+    })
+
+
+def legacy_stats():
+    topic_counts_local = {}
+    source_counts_local = {}
+    category_counts_local = {}
+    for article in news_articles:
+        topic_counts_local[article['topic']] = topic_counts_local.get(article['topic'], 0) + 1
+        source_counts_local[article['source']] = source_counts_local.get(article['source'], 0) + 1
+        category = article.get('category', 'general')
+        category_counts_local[category] = category_counts_local.get(category, 0) + 1
+    return jsonify({
+        "total_articles": len(news_articles),
+        "by_topic": topic_counts_local,
+        "by_category": category_counts_local,
+        "top_sources": dict(sorted(source_counts_local.items(), key=lambda x: x[1], reverse=True)[:5]),
+        "last_updated": news_articles[-1]['fetched_at'] if news_articles else None
+    })
+
+
+def legacy_answer(answer, relevant):
+    return jsonify({
+        "answer": answer,
+        "sources": [
+            {
+                "title": article['title'],
+                "source": article['source'],
+                "url": article['url'],
+                "topic": article['topic'],
+                "category": article.get('category', 'general')
+            }
+            for article in relevant[:6]
+        ],
+        "method": "gemini_ai",
+        "quality": "premium",
+        "articles_analyzed": 50,
+        "relevant_found": len(relevant)
+    })
+
+
+def measure(view, accept_encoding, iterations):
+    """CPU seconds per call and response size for one view"""
+    with app.test_request_context(headers={"Accept-Encoding": accept_encoding}):
+        response = view()
+        size = len(response.get_data())
+        started = time.process_time()
+        for _ in range(iterations):
+            view().get_data()
+        cpu = (time.process_time() - started) / iterations
+    return cpu, size
+
+
+def main(count=500, iterations=2000):
+    seed_articles(count)
+    relevant = news_articles[-10:]
+    answer = simple_app.generate_smart_answer("What are the latest technology developments?", relevant) * 2
+
+    cases = [
+        ("/api/articles", legacy_articles, simple_app.get_articles),
+        ("/api/stats", legacy_stats, simple_app.get_stats),
+        ("/v1/pw_ai_answer", lambda: legacy_answer(answer, relevant),
+         lambda: answer_response(answer, relevant[:6], "gemini_ai", "premium", 50, len(relevant)))
+    ]
+
+    print("\n" + "=" * 72)
+    print("Live News Analyst - Serialization Benchmark")
+    print("=" * 72)
+    print(f"📚 Articles in store: {len(news_articles)} | Iterations: {iterations}")
+    print(f"⚙️  orjson: {'yes' if FAST_JSON_AVAILABLE else 'no'} | brotli: {'yes' if BROTLI_AVAILABLE else 'no'}")
+    print(f"\n{'endpoint':<20}{'path':<10}{'encoding':<10}{'bytes':>10}{'cpu µs/req':>14}")
+    print("-" * 72)
+
+    encodings = ["identity", "gzip"] + (["br"] if BROTLI_AVAILABLE else [])
+    for name, legacy, fast in cases:
+        cpu, size = measure(legacy, "identity", iterations)
+        print(f"{name:<20}{'legacy':<10}{'identity':<10}{size:>10}{cpu * 1e6:>14.1f}")
+        for encoding in encodings:
+            cpu, size = measure(fast, encoding, iterations)
+            print(f"{name:<20}{'fast':<10}{encoding:<10}{size:>10}{cpu * 1e6:>14.1f}")
+        print()
+
+    print("=" * 72 + "\n")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    main(count, iterations)
@@ -0,0 +1,128 @@
+"""
+Sharded retrieval benchmark: linear scan vs parallel fan-out over shards
+- Builds synthetic stores of 10k to 1M articles spread over 30 days
+- Compares find_relevant_articles over the whole store with the sharded search
+- Checks both return the same articles (where the linear scan is run)
+- Reports ingest/seal time, query latency and memory per store size
+- Usage: python bench_shards.py [sizes...]   e.g. python bench_shards.py 10000 100000
+"""
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+import simple_app
+from article_shards import Query, ShardedArticleStore
+
+LINEAR_LIMIT = 100000   # Larger stores skip the (slow) linear baseline
+QUESTIONS = [
+    "What are the latest AI developments?",
+    "How is the stock market doing today?",
+    "Any news about climate research?",
+    "What happened with cryptocurrency regulation?",
+    "Latest space exploration news",
+    "What are tech companies announcing?",
+    "Tell me about quantum computing breakthroughs",
+    "What is going on with interest rates and inflation?",
+]
+SOURCES = ["Reuters", "Bloomberg", "TechCrunch", "BBC News", "The Verge", "Ars Technica", "CNBC",
+           "Local Gazette", "Daily Planet", "Engadget", "Forbes", "Nature"]
+
+
+def synthetic_articles(count, seed=7):
+    """Articles mixing category keywords with filler vocabulary"""
+    rng = random.Random(seed)
+    topic_words = [keyword for keywords in simple_app.TOPIC_KEYWORDS.values() for keyword in keywords]
+    filler = [f"{stem}{suffix}" for stem in ("report", "market", "policy", "launch", "study", "deal", "plan",
+                                             "growth", "team", "region", "update", "review")
+              for suffix in ("", "s", "ed", "ing", "er", "al", "ly", "ion", "ive", "ment")]
+    filler += [f"term{i}" for i in range(3000)]
+    categories = list(simple_app.TOPIC_KEYWORDS) + ["general"]
+    now = datetime.now()
+    for i in range(count):
+        title = " ".join(rng.choice(filler if rng.random() < 0.85 else topic_words) for _ in range(9))
+        description = " ".join(rng.choice(filler if rng.random() < 0.9 else topic_words) for _ in range(22))
+        yield {
+            "title": title.capitalize(),
+            "description": description,
+            "url": f"https://news.example.com/article-{i}",
+            "source": rng.choice(SOURCES),
+            "topic": "technology",
+            "category": rng.choice(categories),
+            "fetched_at": (now - timedelta(seconds=(count - i) * 30 * 86400 / count)).isoformat()
+        }
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000
+
+
+def run(size):
+    tracemalloc.start()
+    articles = list(synthetic_articles(size))
+    articles_bytes = tracemalloc.get_traced_memory()[0]
+
+    store = ShardedArticleStore(simple_app.score_article, simple_app.article_fetch_time,
+                                simple_app.AUTHORITATIVE_SOURCES,
+                                timedelta(hours=simple_app.RECENCY_WINDOW_HOURS),
+                                simple_app.SHARD_SIZE, simple_app.SHARD_WORKERS)
+    started = time.perf_counter()
+    for article in articles:
+        store.add(article)
+    store.flush()
+    ingest_seconds = time.perf_counter() - started
+    index_bytes = tracemalloc.get_traced_memory()[0] - articles_bytes
+    tracemalloc.stop()
+
+    # Pin the clock so both paths apply the same recency boosts
+    now = simple_app.clock()
+    simple_app.clock = lambda: now
+    cold, warm, partials, mismatches = [], [], 0, 0
+    linear = []
+    for question in QUESTIONS:
+        query = Query(question.lower(), simple_app.extract_keywords(question),
+                      simple_app.query_terms(question), now)
+        # The first call fills the shards' keyword lookup caches
+        for timings in (cold, warm):
+            started = time.perf_counter()
+            result, partial = store.search(query, limit=10, deadline=None)
+            timings.append(time.perf_counter() - started)
+            partials += partial
+
+        if size <= LINEAR_LIMIT:
+            started = time.perf_counter()
+            expected = simple_app.find_relevant_articles(question, articles)
+            linear.append(time.perf_counter() - started)
+            mismatches += [a['url'] for a in result] != [a['url'] for a in expected]
+    simple_app.clock = datetime.now
+
+    stats = store.stats()
+    print(f"\n📚 {size:,} articles | {stats['shards']} shards ({stats['sealed_shards']} sealed) | "
+          f"{stats['workers']} workers")
+    print(f"   Ingest + seal: {ingest_seconds:.2f} s ({size / ingest_seconds:,.0f} articles/s)")
+    print(f"   Memory: articles {articles_bytes / 2**20:,.1f} MB | shard indexes {index_bytes / 2**20:,.1f} MB")
+    print(f"   Sharded search: cold p50 {percentile(cold, 50):.1f} ms | p95 {percentile(cold, 95):.1f} ms"
+          f" | warm p50 {percentile(warm, 50):.1f} ms | p95 {percentile(warm, 95):.1f} ms"
+          f" | partial results {partials}")
+    if linear:
+        print(f"   Linear scan:    p50 {percentile(linear, 50):.1f} ms | p95 {percentile(linear, 95):.1f} ms"
+              f" | speedup {percentile(linear, 50) / percentile(cold, 50):.1f}x cold,"
+              f" {percentile(linear, 50) / percentile(warm, 50):.1f}x warm")
+        print(f"   Same results as linear scan: {'✅' if not mismatches else f'❌ {mismatches} differ'}")
+    else:
+        print(f"   Linear scan:    skipped above {LINEAR_LIMIT:,} articles")
+    return mismatches
+
+
+def main(sizes):
+    print("\n" + "=" * 72)
+    print("Live News Analyst - Sharded Retrieval Benchmark")
+    print("=" * 72)
+    mismatches = sum(run(size) for size in sizes)
+    print("\n" + "=" * 72 + "\n")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]))
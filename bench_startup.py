@@ -0,0 +1,99 @@
+"""
+Startup benchmark: time to first health check and import cost per module
+- Starts simple_app.py in lazy and eager mode and polls / until it answers
+- Polls /api/status until every warm-up stage has finished
+- Uses python -X importtime to report the heaviest imports
+- Usage: python bench_startup.py [runs]
+"""
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TIMEOUT = 60
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_startup(mode):
+    """Seconds until / returns 200 and until /api/status reports ready"""
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), STARTUP_MODE=mode, PYTHONUNBUFFERED="1")
+    base_url = f"http://127.0.0.1:{port}"
+
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "simple_app.py"], cwd=HERE, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    healthy = ready = None
+    try:
+        while time.perf_counter() - started < TIMEOUT:
+            try:
+                if healthy is None and requests.get(f"{base_url}/", timeout=1).status_code == 200:
+                    healthy = time.perf_counter() - started
+                if healthy is not None and requests.get(f"{base_url}/api/status", timeout=1).json().get("ready"):
+                    ready = time.perf_counter() - started
+                    break
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return healthy, ready
+
+
+def import_costs(mode, top=12):
+    """Total import time of simple_app and the cumulative cost of each of its direct imports"""
+    env = dict(os.environ, STARTUP_MODE=mode)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import simple_app"],
+                            cwd=HERE, env=env, capture_output=True, text=True)
+    costs = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)", line)
+        if not match:
+            continue
+        cumulative, depth, module = int(match.group(2)), len(match.group(3)), match.group(4)
+        if module == "simple_app":
+            total = cumulative
+            break
+        # Children are printed before their parent, two spaces deeper per level:
+        # simple_app's direct imports are the depth-3 lines after the previous top-level module
+        if depth == 1:
+            costs = {}
+        elif depth == 3:
+            costs[module] = costs.get(module, 0) + cumulative
+    return total, sorted(costs.items(), key=lambda x: x[1], reverse=True)[:top]
+
+
+def main(runs=3):
+    print("\n" + "=" * 60)
+    print("Live News Analyst - Startup Benchmark")
+    print("=" * 60)
+
+    for mode in ("lazy", "eager"):
+        print(f"\n🚀 STARTUP_MODE={mode} ({runs} runs)")
+        for run in range(1, runs + 1):
+            healthy, ready = time_startup(mode)
+            healthy_text = f"{healthy * 1000:.0f} ms" if healthy is not None else "timeout"
+            ready_text = f"{ready * 1000:.0f} ms" if ready is not None else "timeout"
+            print(f"   Run {run}: first health check {healthy_text} | fully warmed {ready_text}")
+
+        total, costs = import_costs(mode)
+        print(f"\n📦 Import cost of simple_app ({mode}): {total / 1000:.1f} ms total, heaviest direct imports:")
+        for module, microseconds in costs:
+            print(f"   {module:<32}{microseconds / 1000:>10.1f} ms")
+
+    print("\n" + "=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,162 @@
+"""
+Rolling per-category digests, rebuilt incrementally in the background
+- Every category/topic keeps a window of its most recent articles
+- Only categories that received new articles are marked dirty and rebuilt
+- Dirty categories can be summarized together in one batched call
+- Intent-matched questions are answered straight from a ready digest
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+DIGEST_WINDOW = 20       # Most recent articles kept per digest
+DIGEST_DEBOUNCE = 2      # Seconds to wait for more articles before rebuilding
+
+
+class Digest:
+    """A ready-made summary for one category or topic"""
+
+    def __init__(self, key, answer, articles, source, build_ms):
+        self.key = key
+        self.answer = answer
+        self.articles = articles
+        self.source = source
+        self.build_ms = build_ms
+        self.built_at = datetime.now()
+        self.built_monotonic = time.monotonic()
+
+
+class DigestBuilder:
+    """Keeps one digest per key fresh, rebuilding only what changed
+
+    build_fn(key, articles) returns the digest text for one key.
+    batch_fn({key: articles}), when given, returns {key: text} for many keys
+    at once, or None if it made no call; keys it leaves out are built with build_fn.
+    active(), when given, pauses background rebuilds while it returns False
+    (dirty keys wait until it returns True again).
+    """
+
+    def __init__(self, build_fn, batch_fn=None, window=DIGEST_WINDOW, debounce=DIGEST_DEBOUNCE, active=None):
+        self.build_fn = build_fn
+        self.batch_fn = batch_fn
+        self.active = active
+        self.window = window
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._recent = {}
+        self._digests = {}
+        self._dirty = set()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.rebuilds = 0
+        self.batched_calls = 0
+
+    def add(self, keys, article):
+        """Record a new article under each of its digest keys"""
+        with self._lock:
+            for key in keys:
+                recent = self._recent.get(key)
+                if recent is None:
+                    recent = self._recent[key] = deque(maxlen=self.window)
+                recent.appendleft(article)
+                self._dirty.add(key)
+        self._wakeup.set()
+
+    def get(self, key):
+        """Return the digest for key, or None if missing or out of date"""
+        with self._lock:
+            if key in self._dirty:
+                return None
+            return self._digests.get(key)
+
+    def rebuild_dirty(self):
+        """Rebuild every dirty digest; returns the keys rebuilt"""
+        with self._lock:
+            dirty = {key: list(self._recent[key]) for key in self._dirty}
+            self._dirty.clear()
+        if not dirty:
+            return []
+
+        batched = {}
+        if self.batch_fn:
+            started = time.perf_counter()
+            try:
+                batched = self.batch_fn(dirty)
+                if batched is not None:
+                    self.batched_calls += 1
+                batched = batched or {}
+            except Exception as e:
+                print(f"⚠️  Batched digest build failed: {e}, using local digests")
+                batched = {}
+            batch_ms = (time.perf_counter() - started) * 1000
+
+        built = {}
+        for key, articles in dirty.items():
+            if batched.get(key):
+                built[key] = Digest(key, batched[key], articles, "gemini", batch_ms)
+                continue
+            started = time.perf_counter()
+            try:
+                answer = self.build_fn(key, articles)
+            except Exception as e:
+                print(f"⚠️  Digest build failed for {key}: {e}")
+                continue
+            built[key] = Digest(key, answer, articles, "local", (time.perf_counter() - started) * 1000)
+
+        with self._lock:
+            for key, digest in built.items():
+                # Only publish if no newer articles arrived while building
+                if key not in self._dirty:
+                    self._digests[key] = digest
+            self.rebuilds += len(built)
+
+        return list(built)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Let the rest of a fetch batch land before rebuilding
+            time.sleep(self.debounce)
+            self._wakeup.clear()
+            if not self.is_active():
+                continue
+            try:
+                keys = self.rebuild_dirty()
+                if keys:
+                    print(f"🗂️  Rebuilt {len(keys)} digest(s): {', '.join(sorted(keys))}")
+            except Exception as e:
+                print(f"⚠️  Digest builder error: {e}")
+
+    def is_active(self):
+        return self.active is None or self.active()
+
+    def start(self):
+        """Start the background rebuild thread (idempotent)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def freshness(self):
+        """Per-key digest age and state, for the status endpoint"""
+        now = time.monotonic()
+        with self._lock:
+            keys = sorted(set(self._recent) | set(self._digests))
+            report = {}
+            for key in keys:
+                digest = self._digests.get(key)
+                report[key] = {
+                    "built_at": digest.built_at.isoformat() if digest else None,
+                    "age_seconds": round(now - digest.built_monotonic, 1) if digest else None,
+                    "articles": len(self._recent.get(key, ())),
+                    "dirty": key in self._dirty,
+                    "source": digest.source if digest else None,
+                    "build_ms": round(digest.build_ms, 2) if digest else None
+                }
+        return {
+            "active": self.is_active(),
+            "rebuilds": self.rebuilds,
+            "batched_calls": self.batched_calls,
+            "digests": report
+        }
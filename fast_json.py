@@ -0,0 +1,96 @@
+"""
+Fast-path JSON serialization for the API endpoints
+- Article fragments are encoded once at ingest and reused by every response
+- Responses are assembled from cached byte fragments instead of rebuilt dicts
+- Uses orjson when installed, falls back to the standard json module
+- Negotiates brotli/gzip compression for large payloads
+"""
+import gzip
+import json
+from flask import Response
+
+# Try to use a faster encoder, but don't fail if not available
+try:
+    import orjson
+    FAST_JSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    FAST_JSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+COMPRESS_MIN_BYTES = 1024   # Smaller payloads aren't worth the CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dumps(obj):
+    """Encode an object to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_array(fragments):
+    """Join pre-encoded JSON values into an array"""
+    return b'[' + b','.join(fragments) + b']'
+
+
+def json_object(fields):
+    """Build a JSON object from (key, value) pairs; bytes values are spliced in as-is"""
+    parts = []
+    for key, value in fields:
+        encoded = value if isinstance(value, bytes) else dumps(value)
+        parts.append(dumps(key) + b':' + encoded)
+    return b'{' + b','.join(parts) + b'}'
+
+
+def choose_encoding(accept_encoding, size):
+    """Pick a content encoding the client accepts, or None to send as-is"""
+    if size < COMPRESS_MIN_BYTES or not accept_encoding:
+        return None
+
+    accepted = set()
+    for item in accept_encoding.lower().split(','):
+        name, _, params = item.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip())
+
+    if BROTLI_AVAILABLE and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+def encode_body(body, accept_encoding):
+    """Return (payload, encoding) for a JSON body and an Accept-Encoding header"""
+    encoding = choose_encoding(accept_encoding, len(body))
+    return compress(body, encoding), encoding
+
+
+def json_response(body, accept_encoding=None, status=200, encoded=None):
+    """Wrap JSON bytes in a Response, compressing when the client allows it
+
+    Pass encoded=(payload, encoding) to reuse an already-compressed body.
+    """
+    payload, encoding = encoded if encoded is not None else encode_body(body, accept_encoding)
+    response = Response(payload, status=status, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,145 @@
+"""
+Live push feed: single fan-out broadcaster for Server-Sent Events
+- The news fetcher publishes one event per committed batch
+- Every subscriber (open browser tab) gets its own bounded buffer
+- Slow subscribers are dropped instead of blocking everyone else
+- Recent events are kept in a ring so clients can resume via Last-Event-ID
+- Event ids are "<epoch>-<n>" with a per-process epoch, so a client resuming
+  from before a server restart is told to resync instead of missing events
+"""
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+STREAM_BUFFER_SIZE = 64      # Pending events per subscriber before it is dropped
+STREAM_HISTORY_SIZE = 256    # Events kept for Last-Event-ID resume
+STREAM_KEEPALIVE = 15        # Seconds between keep-alive comments
+
+
+class Subscriber:
+    """One connected client with its own bounded event buffer"""
+
+    def __init__(self, buffer_size):
+        self.queue = queue.Queue(maxsize=buffer_size)
+        self.dropped = False
+
+
+class Broadcaster:
+    """Fan out pre-encoded events to many subscribers without blocking"""
+
+    def __init__(self, buffer_size=STREAM_BUFFER_SIZE, history_size=STREAM_HISTORY_SIZE, epoch=None):
+        self.buffer_size = buffer_size
+        self.epoch = epoch or str(int(time.time() * 1000))
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history_size)
+        self._last_id = 0
+        self.published_count = 0
+        self.dropped_count = 0
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    @property
+    def last_event_id(self):
+        return self._format_id(self._last_id)
+
+    def _format_id(self, n):
+        return f"{self.epoch}-{n}"
+
+    def _encode(self, event_id, event_type, data):
+        """Encode an event once; the same bytes are shared by every subscriber
+
+        data may be a JSON-serializable object or already-encoded JSON bytes.
+        """
+        payload = data if isinstance(data, bytes) else json.dumps(data, separators=(',', ':')).encode('utf-8')
+        return f"id: {self._format_id(event_id)}\nevent: {event_type}\ndata: ".encode('utf-8') + payload + b"\n\n"
+
+    def subscribe(self, last_event_id=None):
+        """Register a subscriber, replaying missed events when resuming"""
+        subscriber = Subscriber(self.buffer_size)
+
+        with self._lock:
+            epoch, resume_from = _parse_event_id(last_event_id)
+            if epoch is not None and (epoch != self.epoch or resume_from != self._last_id):
+                missed = [message for event_id, message in self._history if event_id > resume_from]
+                oldest = self._history[0][0] if self._history else self._last_id + 1
+                # Other process (restart), gap in history or backlog too large: tell the client to reload
+                if (epoch != self.epoch or resume_from > self._last_id or oldest > resume_from + 1
+                        or len(missed) >= self.buffer_size):
+                    missed = [self._encode(self._last_id, "resync", {"last_event_id": self.last_event_id})]
+                for message in missed:
+                    subscriber.queue.put_nowait(message)
+
+            self._subscribers.add(subscriber)
+
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event_type, data):
+        """Push an event to every subscriber; full buffers get disconnected"""
+        with self._lock:
+            self._last_id += 1
+            message = self._encode(self._last_id, event_type, data)
+            self._history.append((self._last_id, message))
+            self.published_count += 1
+
+            slow = []
+            for subscriber in self._subscribers:
+                try:
+                    subscriber.queue.put_nowait(message)
+                except queue.Full:
+                    slow.append(subscriber)
+
+            for subscriber in slow:
+                subscriber.dropped = True
+                self._subscribers.discard(subscriber)
+            self.dropped_count += len(slow)
+
+        if slow:
+            print(f"⚠️  Dropped {len(slow)} slow stream subscriber(s)")
+
+        return self._last_id
+
+    def events(self, subscriber, keepalive=STREAM_KEEPALIVE):
+        """Yield SSE bytes for a subscriber until it disconnects or is dropped"""
+        try:
+            yield b"retry: 3000\n\n"
+            while not subscriber.dropped:
+                try:
+                    message = subscriber.queue.get(timeout=keepalive)
+                except queue.Empty:
+                    yield b": keepalive\n\n"
+                    continue
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        return {
+            "subscribers": self.subscriber_count,
+            "last_event_id": self.last_event_id,
+            "published": self.published_count,
+            "dropped": self.dropped_count
+        }
+
+
+def _parse_event_id(value):
+    """Split a Last-Event-ID value into (epoch, n); (None, None) if absent
+
+    Ids without an epoch (or junk) come back with an epoch of "" so they never
+    match the current process and trigger a resync.
+    """
+    if value is None or value == '':
+        return None, None
+    epoch, _, n = str(value).rpartition('-')
+    try:
+        return epoch, int(n)
+    except ValueError:
+        return "", 0
@@ -0,0 +1,329 @@
+"""
+Deterministic record/replay for ingest and query workloads
+- Recording: set RECORD_PATH=workload.jsonl.gz and run the app normally;
+  raw GNews responses and /v1/pw_ai_answer prompts are appended with timestamps
+- Replay: drives the full app (fetcher ingest, retrieval, answer generators,
+  mocked Gemini) under a virtual clock at 1x or accelerated speed
+- Produces a latency/throughput report that can be compared between builds
+
+Usage:
+    python replay.py workload.jsonl.gz [--speed 10] [--report out.json] [--compare baseline.json]
+"""
+import argparse
+import contextlib
+import gzip
+import hashlib
+import io
+import json
+import sys
+import threading
+import time
+import types
+import zlib
+from collections import Counter
+from datetime import datetime
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class Recorder:
+    """Append-only JSONL log of GNews responses and incoming prompts"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.records = 0
+        print(f"⏺️  Recording workload to {path}")
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            # One complete gzip member per record, so a recording cut off by
+            # SIGTERM/SIGKILL never loses its trailer
+            with _open(self.path, 'a') as f:
+                f.write(line + '\n')
+            self.records += 1
+
+    def record_gnews(self, topic, params, status, body):
+        # Never write the API key to disk
+        safe_params = {key: value for key, value in params.items() if key != 'apikey'}
+        self._write({"t": time.time(), "type": "gnews", "topic": topic, "params": safe_params,
+                     "status": status, "body": body})
+
+    def record_prompt(self, prompt, tenant=None):
+        record = {"t": time.time(), "type": "prompt", "prompt": prompt}
+        if tenant:
+            record["tenant"] = tenant
+        self._write(record)
+
+
+def _read_lines(path):
+    """Complete lines of a recording and whether it ended early
+
+    Decompresses member by member so everything before a truncated end is kept.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    truncated = False
+    if path.endswith('.gz'):
+        chunks = []
+        while data.strip(b'\0'):
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            try:
+                chunks.append(decompressor.decompress(data))
+            except zlib.error:
+                truncated = True
+                break
+            if not decompressor.eof:
+                truncated = True
+                break
+            data = decompressor.unused_data
+        data = b"".join(chunks)
+    lines = data.decode('utf-8', errors='replace').split('\n')
+    # Anything after the last newline is a half-written record
+    return lines[:-1], truncated or bool(lines[-1].strip())
+
+
+def load_events(path):
+    """Read a recording, ordered by timestamp"""
+    lines, truncated = _read_lines(path)
+    events = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            events.append(json.loads(line))
+        except json.JSONDecodeError:
+            truncated = True
+    if truncated:
+        print(f"⚠️  {path} ends early; replaying the {len(events)} complete events before the cut")
+    events.sort(key=lambda event: event['t'])
+    return events
+
+
+class VirtualClock:
+    """Stands in for datetime.now so recency scoring follows the recording"""
+
+    def __init__(self, start):
+        self.current = start
+
+    def set(self, timestamp):
+        self.current = timestamp
+
+    def now(self):
+        return datetime.fromtimestamp(self.current)
+
+
+class MockGeminiModel:
+    """Deterministic Gemini stand-in: same prompt, same answer"""
+
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+        self.tokens = 0
+
+    def generate_content(self, prompt, generation_config=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]
+        text = (f"## Replay answer {digest}\n\n"
+                "- Deterministic mocked Gemini response used for offline replay.\n"
+                f"- Prompt length: {len(prompt)} characters.\n")
+        total_tokens = (len(prompt) + len(text)) // 4
+        self.tokens += total_tokens
+        return types.SimpleNamespace(
+            text=text,
+            usage_metadata=types.SimpleNamespace(total_token_count=total_tokens)
+        )
+
+
+def _latency_summary(values):
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+        "max": round(ordered[-1] * 1000, 3)
+    }
+
+
+def replay(path, speed=0.0, gemini_latency_ms=0.0, verbose=False):
+    """Drive the app through a recording and return a report
+
+    speed=1 replays in real time, speed=10 ten times faster, speed=0 as fast as possible.
+    """
+    import simple_app
+
+    events = load_events(path)
+    if not events:
+        raise ValueError(f"No events in {path}")
+
+    clock = VirtualClock(events[0]['t'])
+    gemini = MockGeminiModel(gemini_latency_ms)
+    simple_app.clock = clock.now
+    simple_app.gemini_model = gemini
+    simple_app.recorder = None
+    # A wall-clock deadline would make RETRIEVAL_SCOPE=all answers depend on machine load
+    simple_app.QUERY_DEADLINE_MS = 0
+    client = simple_app.app.test_client()
+
+    ingest_latencies = []
+    digest_latencies = []
+    query_latencies = []
+    methods = Counter()
+    responses = []
+    errors = 0
+    articles_ingested = 0
+
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    wall_start = time.perf_counter()
+    with output:
+        for event in events:
+            offset = event['t'] - events[0]['t']
+            if speed > 0:
+                delay = wall_start + offset / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            clock.set(event['t'])
+
+            if event['type'] == 'gnews':
+                if event.get('status') != 200 or not event.get('body'):
+                    continue
+                started = time.perf_counter()
+                params = event.get('params', {})
+                new_articles = simple_app.commit_batch(event['body'].get('articles', []), event['topic'],
+                                                       params.get('lang', 'en'), params.get('country', 'us'))
+                ingest_latencies.append(time.perf_counter() - started)
+                articles_ingested += len(new_articles)
+
+                # Rebuild digests inline so every query sees the same state
+                started = time.perf_counter()
+                simple_app.digest_builder.rebuild_dirty()
+                digest_latencies.append(time.perf_counter() - started)
+
+            elif event['type'] == 'prompt':
+                started = time.perf_counter()
+                payload = {"prompt": event['prompt']}
+                if event.get('tenant'):
+                    payload["tenant"] = event['tenant']
+                response = client.post('/v1/pw_ai_answer', json=payload)
+                query_latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+                body = response.get_json(silent=True) or {}
+                methods[body.get('method', 'unknown')] += 1
+                responses.append([body.get('method'),
+                                  hashlib.sha1((body.get('answer') or '').encode('utf-8')).hexdigest()[:12],
+                                  [source.get('url') for source in body.get('sources', [])]])
+
+    wall_seconds = time.perf_counter() - wall_start
+    query_seconds = sum(query_latencies)
+
+    return {
+        "recording": path,
+        "events": len(events),
+        "speed": speed,
+        "virtual_seconds": round(events[-1]['t'] - events[0]['t'], 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "ingest": {
+            "batches": len(ingest_latencies),
+            "articles": articles_ingested,
+            "latency_ms": _latency_summary(ingest_latencies),
+            "digest_rebuild_ms": _latency_summary(digest_latencies)
+        },
+        "queries": {
+            "count": len(query_latencies),
+            "errors": errors,
+            "throughput_qps": round(len(query_latencies) / query_seconds, 2) if query_seconds else None,
+            "latency_ms": _latency_summary(query_latencies),
+            "methods": dict(methods),
+            # Per query: method, answer hash, source urls; identical between runs of one build
+            "responses": responses
+        },
+        "gemini_mock": {
+            "calls": gemini.calls,
+            "tokens": gemini.tokens
+        },
+        "semantic_cache": simple_app.semantic_cache.stats()
+    }
+
+
+def compare(report, baseline):
+    """Print the change in headline metrics against a baseline report"""
+    rows = [
+        ("ingest p50 ms", ("ingest", "latency_ms", "p50")),
+        ("ingest p95 ms", ("ingest", "latency_ms", "p95")),
+        ("query p50 ms", ("queries", "latency_ms", "p50")),
+        ("query p95 ms", ("queries", "latency_ms", "p95")),
+        ("query p99 ms", ("queries", "latency_ms", "p99")),
+        ("query throughput qps", ("queries", "throughput_qps")),
+        ("gemini calls", ("gemini_mock", "calls")),
+    ]
+
+    def lookup(data, path):
+        for key in path:
+            data = (data or {}).get(key)
+        return data
+
+    same = lookup(baseline, ("queries", "responses")) == lookup(report, ("queries", "responses"))
+    print(f"\n{'answers':<24}{'identical' if same else 'differ':>34}")
+    print(f"{'metric':<24}{'baseline':>12}{'current':>12}{'change':>10}")
+    print("-" * 58)
+    for label, path in rows:
+        before, after = lookup(baseline, path), lookup(report, path)
+        if before is None or after is None:
+            continue
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"{label:<24}{before:>12}{after:>12}{change:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded ingest/query workload")
+    parser.add_argument("recording", help="JSONL(.gz) file written with RECORD_PATH")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="1 = real time, 10 = ten times faster, 0 = as fast as possible (default)")
+    parser.add_argument("--gemini-latency-ms", type=float, default=0.0,
+                        help="Simulated latency of the mocked Gemini call")
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline report to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's own log output")
+    args = parser.parse_args(argv)
+
+    report = replay(args.recording, speed=args.speed, gemini_latency_ms=args.gemini_latency_ms,
+                    verbose=args.verbose)
+
+    print("\n" + "=" * 60)
+    print("Live News Analyst - Workload Replay")
+    print("=" * 60)
+    # Per-query responses go to the --report file only
+    summary = {**report, "queries": {key: value for key, value in report["queries"].items() if key != "responses"}}
+    print(json.dumps(summary, indent=2))
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.report}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Semantic answer cache for the Gemini path
+- Questions become hashed TF-IDF vectors (local, no network calls)
+- A cached answer is reused when a new question is similar enough AND the
+  relevant articles it was built from still match the current ones
+- Bounded by an approximate memory budget with least-recently-used eviction
+- Counts the Gemini calls and tokens it saved
+"""
+import math
+import re
+import threading
+import zlib
+from collections import Counter, OrderedDict
+
+VECTOR_DIM = 4096
+
+# Words that change the phrasing but not the meaning of a news question
+FILLER_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'about',
+    'is', 'are', 'was', 'were', 'be', 'been', 'do', 'does', 'did', 'can', 'could', 'would', 'will',
+    'what', 'whats', 'which', 'who', 'me', 'tell', 'show', 'give', 'i', 'you', 'we', 'us', 'there',
+    'any', 'some', 'all', 'please', 'going', 'happening', 'news', 'developments', 'development',
+    'updates', 'update', 'stories', 'story', 'headlines', 'headline', 'things', 'stuff'
+}
+
+# Different ways of saying "recent", folded into one token
+RECENCY_WORDS = {'latest', 'recent', 'recently', 'new', 'newest', 'today', 'todays', 'current',
+                 'currently', 'now', 'fresh', 'breaking', 'this', 'week', 'past'}
+
+# Multi-word phrases folded into a single token before splitting
+PHRASES = {
+    "artificial intelligence": "ai",
+    "machine learning": "ml",
+    "what's new": "latest",
+    "what is new": "latest",
+}
+
+
+def question_tokens(question):
+    """Normalize a question into the tokens used for its vector"""
+    text = question.lower().replace("’", "'")
+    for phrase, replacement in PHRASES.items():
+        text = text.replace(phrase, replacement)
+    text = re.sub(r"'s\b", "", text)
+    words = re.findall(r"\w+", text)
+
+    tokens = []
+    for word in words:
+        if word in RECENCY_WORDS:
+            word = '_recent'
+        elif word in FILLER_WORDS:
+            continue
+        elif len(word) > 4 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        if word not in tokens:
+            tokens.append(word)
+    return tokens
+
+
+def _hashed_tf(tokens):
+    """Term frequencies keyed by a stable hash bucket"""
+    return Counter(zlib.crc32(token.encode('utf-8')) % VECTOR_DIM for token in tokens)
+
+
+class CacheEntry:
+    """One cached Gemini answer"""
+
+    def __init__(self, question, tf, source_urls, answer, tokens, namespace=None):
+        self.question = question
+        self.namespace = namespace
+        self.tf = tf
+        self.source_urls = frozenset(source_urls)
+        self.answer = answer
+        self.tokens = tokens
+        self.size = (
+            len(question) + len(answer.encode('utf-8'))
+            + sum(len(url) for url in self.source_urls)
+            + 64 * len(tf) + 256
+        )
+
+
+class SemanticCache:
+    """Similarity-keyed answer cache with source validation and a memory cap"""
+
+    def __init__(self, threshold=0.8, min_source_overlap=0.6, max_bytes=8 * 1024 * 1024):
+        self.threshold = threshold
+        self.min_source_overlap = min_source_overlap
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._doc_freq = Counter()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.tokens_avoided = 0
+
+    def _idf(self, bucket):
+        return math.log((1 + len(self._entries)) / (1 + self._doc_freq[bucket])) + 1
+
+    def _similarity(self, tf_a, tf_b):
+        """Cosine similarity of two hashed TF vectors under the current IDF"""
+        weights = {}
+        dot = 0.0
+        norm_a = 0.0
+        norm_b = 0.0
+        for bucket in tf_a.keys() | tf_b.keys():
+            idf = weights.setdefault(bucket, self._idf(bucket))
+            a = tf_a.get(bucket, 0) * idf
+            b = tf_b.get(bucket, 0) * idf
+            dot += a * b
+            norm_a += a * a
+            norm_b += b * b
+        if not norm_a or not norm_b:
+            return 0.0
+        return dot / math.sqrt(norm_a * norm_b)
+
+    def _source_overlap(self, entry, source_urls):
+        if not entry.source_urls and not source_urls:
+            return 1.0
+        union = entry.source_urls | source_urls
+        return len(entry.source_urls & source_urls) / len(union)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        self._doc_freq.subtract(entry.tf.keys())
+
+    def lookup(self, question, source_urls, namespace=None):
+        """Return a cached answer for a similar question built from the same articles
+
+        Entries are only matched within the same namespace (e.g. one per tenant subscription).
+        """
+        tokens = question_tokens(question)
+        if not tokens:
+            return None
+        tf = _hashed_tf(tokens)
+        source_urls = frozenset(source_urls)
+
+        with self._lock:
+            best_key = None
+            best_score = 0.0
+            for key, entry in self._entries.items():
+                if entry.namespace != namespace:
+                    continue
+                score = self._similarity(tf, entry.tf)
+                if score > best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None or best_score < self.threshold:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best_key]
+            if self._source_overlap(entry, source_urls) < self.min_source_overlap:
+                # Same question, but the news moved on: drop the outdated answer
+                self._remove(best_key)
+                self.stale += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            self.tokens_avoided += entry.tokens
+            return entry.answer
+
+    def store(self, question, source_urls, answer, tokens, namespace=None):
+        """Cache a fresh Gemini answer, evicting least-recently-used entries"""
+        tokens_list = question_tokens(question)
+        if not tokens_list or not answer:
+            return
+        key = (namespace, " ".join(sorted(tokens_list)))
+        entry = CacheEntry(question, _hashed_tf(tokens_list), source_urls, answer, tokens, namespace)
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._doc_freq.update(entry.tf.keys())
+
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "gemini_calls_avoided": self.hits,
+            "tokens_avoided": self.tokens_avoided
+        }
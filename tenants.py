@@ -0,0 +1,210 @@
+"""
+Multi-tenant topic subscriptions over one shared fetcher and article store
+- Each tenant subscribes to (topic, lang, country) feeds, optionally
+  narrowed to a set of categories
+- Overlapping subscriptions are merged: every unique feed is fetched once
+- Articles are stored once; tenants read through per-feed indexes, so memory
+  and GNews calls grow with the number of distinct feeds, not tenants
+- Per-tenant totals are kept as running counters, so stats never rescan a view
+
+TENANTS_CONFIG is a path to a JSON file (or inline JSON) such as:
+    {
+      "newsroom": {"topics": ["technology", "science"]},
+      "paris-desk": {"topics": ["business"], "lang": "fr", "country": "fr",
+                     "categories": ["business", "technology"]}
+    }
+"""
+import heapq
+import json
+import os
+import threading
+from bisect import insort
+from collections import Counter
+
+DEFAULT_TENANT = "default"
+
+
+class Tenant:
+    """One team's subscription: the feeds it reads and an optional category filter"""
+
+    def __init__(self, name, topics, langs, countries, categories=None):
+        self.name = name
+        self.feeds = frozenset((topic, lang, country) for topic in topics for lang in langs for country in countries)
+        self.categories = frozenset(categories) if categories else None
+
+    @property
+    def signature(self):
+        """Tenants with the same signature see exactly the same articles"""
+        return (self.feeds, self.categories)
+
+    def accepts(self, article):
+        return self.categories is None or article.get('category', 'general') in self.categories
+
+    def describe(self):
+        return {
+            "feeds": sorted(list(feed) for feed in self.feeds),
+            "categories": sorted(self.categories) if self.categories else None
+        }
+
+
+def _as_list(value, default):
+    if value is None:
+        return list(default)
+    return [value] if isinstance(value, str) else list(value)
+
+
+def load_tenants(config, default_topics, default_lang="en", default_country="us"):
+    """Build tenants from TENANTS_CONFIG (path or inline JSON); always includes the default tenant"""
+    tenants = {DEFAULT_TENANT: Tenant(DEFAULT_TENANT, default_topics, [default_lang], [default_country])}
+    if not config:
+        return tenants
+
+    if os.path.exists(config):
+        with open(config, encoding='utf-8') as f:
+            raw = json.load(f)
+    else:
+        raw = json.loads(config)
+
+    if not isinstance(raw, dict):
+        raise ValueError("TENANTS_CONFIG must be a JSON object of tenant name -> subscription")
+
+    for name, spec in raw.items():
+        if not isinstance(spec, dict):
+            raise ValueError(f"Tenant {name!r} must be a JSON object, got {type(spec).__name__}")
+        topics = _as_list(spec.get('topics'), default_topics)
+        if not topics:
+            raise ValueError(f"Tenant {name!r} has no topics")
+        tenants[name] = Tenant(
+            name,
+            topics,
+            _as_list(spec.get('lang'), [default_lang]),
+            _as_list(spec.get('country'), [default_country]),
+            _as_list(spec.get('categories'), [])
+        )
+    return tenants
+
+
+def fetch_plan(tenants):
+    """Unique (topic, lang, country) feeds across all tenants, in a stable order"""
+    return sorted(set().union(*(tenant.feeds for tenant in tenants.values())))
+
+
+class ViewCounts:
+    """Running totals of one tenant's view, updated as articles enter it"""
+
+    def __init__(self):
+        self.total = 0
+        self.by_topic = Counter()
+        self.by_category = Counter()
+        self.by_source = Counter()
+        self.newest_seq = -1
+        self.last_updated = None
+
+    def add(self, seq, article):
+        self.total += 1
+        self.by_topic[article['topic']] += 1
+        self.by_category[article.get('category', 'general')] += 1
+        self.by_source[article['source']] += 1
+        # Carried articles can be older than the view's newest
+        if seq > self.newest_seq:
+            self.newest_seq = seq
+            self.last_updated = article.get('fetched_at')
+
+
+class FeedIndex:
+    """Per-feed article lists over one shared store, merged into tenant views on read
+
+    Tenants passed in get running ViewCounts of their views.
+    """
+
+    def __init__(self, tenants=()):
+        self._lock = threading.Lock()
+        self._feeds = {}
+        self._seq_by_url = {}
+        self._feeds_by_url = {}
+        self._tenants = list(tenants)
+        self._counts = {tenant.name: ViewCounts() for tenant in self._tenants}
+        self.version = 0
+
+    def add(self, feed, article):
+        """Index an article under a feed; returns False if it was already there"""
+        url = article['url']
+        with self._lock:
+            seq = self._seq_by_url.get(url)
+            if seq is None:
+                seq = self._seq_by_url[url] = len(self._seq_by_url)
+                self._feeds_by_url[url] = set()
+            feeds = self._feeds_by_url[url]
+            if feed in feeds:
+                return False
+            for tenant in self._tenants:
+                # Entering the view now: not already there through another of its feeds
+                if feed in tenant.feeds and tenant.feeds.isdisjoint(feeds) and tenant.accepts(article):
+                    self._counts[tenant.name].add(seq, article)
+            feeds.add(feed)
+            entries = self._feeds.setdefault(feed, [])
+            if entries and entries[-1][0] > seq:
+                # Seen earlier on another feed: keep the list in store order
+                insort(entries, (seq, article), key=lambda entry: entry[0])
+            else:
+                entries.append((seq, article))
+            self.version += 1
+            return True
+
+    def counts(self, tenant):
+        """Running ViewCounts of a tenant passed to the constructor"""
+        return self._counts[tenant.name]
+
+    def feeds_for(self, article):
+        return self._feeds_by_url.get(article['url'], set())
+
+    def visible(self, tenant, article):
+        """True if the article is in the tenant's view"""
+        return tenant.accepts(article) and not tenant.feeds.isdisjoint(self.feeds_for(article))
+
+    def new_for(self, tenant, new_articles, feed=None, carried=()):
+        """Articles of a committed batch that just entered the tenant's view
+
+        new_articles were stored for the first time; carried were already stored
+        and have just been added to `feed`, so they are only new to tenants that
+        didn't already see them through another feed.
+        """
+        batch = [article for article in new_articles if self.visible(tenant, article)]
+        if feed in tenant.feeds:
+            batch += [article for article in carried
+                      if tenant.accepts(article) and tenant.feeds.isdisjoint(self.feeds_for(article) - {feed})]
+        return batch
+
+    def view(self, tenant, limit=None):
+        """Tenant's articles, newest first, deduplicated across its feeds"""
+        # With a limit only the newest entries of each feed are copied, widening until enough match
+        window = max(limit * 2, 32) if limit is not None else None
+        while True:
+            with self._lock:
+                # Copied under the lock: insort can shift entries while we merge
+                lists = [self._feeds[feed] for feed in tenant.feeds if feed in self._feeds]
+                tails = [entries[-window:] if window else entries[:] for entries in lists]
+                truncated = [tail for tail, entries in zip(tails, lists) if window and len(entries) > window]
+
+            # Below the oldest entry of a cut-off tail, entries of other feeds may be missing
+            cutoff = max(tail[0][0] for tail in truncated) if truncated else -1
+            merged = heapq.merge(*(reversed(tail) for tail in tails), key=lambda entry: entry[0], reverse=True)
+            result = []
+            seen = set()
+            for seq, article in merged:
+                if seq < cutoff:
+                    break
+                if seq in seen:
+                    continue
+                seen.add(seq)
+                if tenant.accepts(article):
+                    result.append(article)
+                    if limit is not None and len(result) >= limit:
+                        return result
+            if not truncated:
+                return result
+            window *= 4
+
+    def feed_sizes(self):
+        with self._lock:
+            return {"/".join(feed): len(entries) for feed, entries in sorted(self._feeds.items())}
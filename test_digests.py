@@ -0,0 +1,96 @@
+"""
+Checks for the incremental digest builder
+- Only keys that received new articles are rebuilt
+- A digest is not published if newer articles arrived while it was built
+- Batched calls are only counted when the batch function made one
+- Plain "latest in <category>" questions map to a digest key, others don't
+"""
+import simple_app
+from digests import DigestBuilder
+
+
+def _article(n):
+    return {"title": f"Headline {n}", "source": "Reuters", "url": f"https://example.com/{n}"}
+
+
+def test_rebuilds_only_dirty_keys():
+    built = []
+    builder = DigestBuilder(lambda key, articles: built.append(key) or f"{key}: {len(articles)}")
+    builder.add(["category:ai", "topic:technology"], _article(1))
+    assert sorted(builder.rebuild_dirty()) == ["category:ai", "topic:technology"]
+
+    built.clear()
+    builder.add(["category:ai"], _article(2))
+    assert builder.rebuild_dirty() == ["category:ai"]
+    assert built == ["category:ai"]
+    assert builder.get("category:ai").answer == "category:ai: 2"
+    assert builder.get("topic:technology").answer == "topic:technology: 1"
+    assert builder.rebuild_dirty() == []
+
+
+def test_not_published_if_articles_arrive_mid_build():
+    def build(key, articles):
+        if len(articles) == 1:
+            # A new article lands while this digest is being built
+            builder.add([key], _article(2))
+        return f"{len(articles)} articles"
+
+    builder = DigestBuilder(build)
+    builder.add(["category:business"], _article(1))
+    builder.rebuild_dirty()
+    assert builder.get("category:business") is None
+    assert builder.freshness()["digests"]["category:business"]["dirty"]
+
+    builder.rebuild_dirty()
+    assert builder.get("category:business").answer == "2 articles"
+
+
+def test_batched_calls_count_only_real_calls():
+    builder = DigestBuilder(lambda key, articles: "local", batch_fn=lambda dirty: None)
+    builder.add(["category:ai"], _article(1))
+    builder.rebuild_dirty()
+    assert builder.batched_calls == 0
+    assert builder.get("category:ai").source == "local"
+
+    builder.batch_fn = lambda dirty: {key: "batched" for key in dirty}
+    builder.add(["category:ai"], _article(2))
+    builder.rebuild_dirty()
+    assert builder.batched_calls == 1
+    assert builder.get("category:ai").source == "gemini"
+
+
+def test_inactive_builder_reports_paused():
+    builder = DigestBuilder(lambda key, articles: "local", active=lambda: False)
+    assert builder.freshness()["active"] is False
+    assert DigestBuilder(lambda key, articles: "local").freshness()["active"] is True
+
+
+def test_match_digest_key():
+    accepted = {
+        "latest in business?": "category:business",
+        "What's new in AI today?": "category:ai",
+        "Latest tech news": "category:technology",
+        "recent finance headlines": "category:business",
+        "any new science stories": "category:science",
+    }
+    for question, key in accepted.items():
+        assert simple_app.match_digest_key(question) == key, question
+
+    rejected = [
+        "What is happening in business?",           # no recency intent
+        "latest AI and business news",              # two categories
+        "latest news",                              # no category
+        "latest Nvidia earnings in business",       # something more specific
+        "Is Tesla stock down today?",
+    ]
+    for question in rejected:
+        assert simple_app.match_digest_key(question) is None, question
+
+
+def test_topic_digests_only_for_servable_keys(monkeypatch):
+    # Topics named like a category are asked for (and served) as the category
+    assert simple_app.digest_keys({"category": "ai", "topic": "technology"}) == ["category:ai"]
+    assert simple_app.digest_keys({"category": "general", "topic": "world"}) == ["category:general", "topic:world"]
+
+    monkeypatch.setattr(simple_app, "NEWS_TOPICS", simple_app.NEWS_TOPICS + ["world"])
+    assert simple_app.match_digest_key("latest world headlines") == "topic:world"
@@ -0,0 +1,96 @@
+"""
+Checks for workload recordings
+- A recording cut off by SIGTERM/SIGKILL stays readable
+- Every complete record before a truncated end is replayed
+- Replaying one recording twice gives the same answers, ranked by the recording's clock
+"""
+import gzip
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from replay import Recorder, load_events
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_recording_survives_sigterm(tmp_path):
+    path = str(tmp_path / "workload.jsonl.gz")
+    script = ("import sys, time; from replay import Recorder; r = Recorder(sys.argv[1]); "
+              "r.record_prompt('first'); r.record_prompt('second'); print('ready', flush=True); time.sleep(60)")
+    process = subprocess.Popen([sys.executable, "-c", script, path], cwd=HERE, stdout=subprocess.PIPE, text=True)
+    try:
+        while "ready" not in process.stdout.readline():
+            pass
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=10)
+    finally:
+        process.kill()
+        process.stdout.close()
+
+    assert [event["prompt"] for event in load_events(path)] == ["first", "second"]
+
+
+def test_truncated_end_keeps_complete_records(tmp_path):
+    path = str(tmp_path / "workload.jsonl.gz")
+    recorder = Recorder(path)
+    for n in range(3):
+        recorder.record_gnews("technology", {"apikey": "secret", "topic": "technology"}, 200, {"articles": [], "n": n})
+    recorder.record_prompt("cut off mid-write")
+
+    # Chop the last record's gzip member in half
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(size - 20)
+
+    events = load_events(path)
+    assert [event["body"]["n"] for event in events] == [0, 1, 2]
+    assert all("apikey" not in event["params"] for event in events)
+
+
+def test_single_unterminated_member_keeps_flushed_lines(tmp_path):
+    # Recordings from a writer that flushed but never closed the gzip stream
+    path = str(tmp_path / "legacy.jsonl.gz")
+    buffer = io.BytesIO()
+    stream = gzip.GzipFile(fileobj=buffer, mode='wb')
+    for n in range(5):
+        stream.write(f'{{"t": {time.time() + n}, "type": "prompt", "prompt": "q{n}"}}\n'.encode('utf-8'))
+    stream.flush()
+    with open(path, 'wb') as f:
+        f.write(buffer.getvalue())
+
+    assert [event["prompt"] for event in load_events(path)] == [f"q{n}" for n in range(5)]
+
+
+def _gnews(t, url):
+    article = {"title": "Zorblax quarterly results", "description": "Zorblax reports its quarter.",
+               "url": url, "source": {"name": "Local Gazette"}, "publishedAt": "2023-11-14T22:00:00Z"}
+    return {"t": t, "type": "gnews", "topic": "technology", "params": {"lang": "en", "country": "us"},
+            "status": 200, "body": {"articles": [article]}}
+
+
+def test_replay_is_deterministic_and_uses_the_recorded_clock(tmp_path):
+    path = str(tmp_path / "workload.jsonl.gz")
+    start = 1700000000  # Long ago: by the wall clock neither article is recent
+    events = [_gnews(start, "https://replay.example.com/older"),
+              _gnews(start + 5 * 3600, "https://replay.example.com/newer"),
+              {"t": start + 5 * 3600 + 60, "type": "prompt", "prompt": "zorblax quarterly"}]
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.writelines(json.dumps(event) + "\n" for event in events)
+
+    reports = []
+    for run in range(2):
+        report = str(tmp_path / f"report{run}.json")
+        subprocess.run([sys.executable, "replay.py", path, "--report", report], cwd=HERE, check=True,
+                       stdout=subprocess.DEVNULL, env={**os.environ, "RETRIEVAL_SCOPE": "all"})
+        with open(report, encoding='utf-8') as f:
+            reports.append(json.load(f)["queries"])
+
+    assert reports[0]["responses"] == reports[1]["responses"]
+    assert reports[0]["methods"] == reports[1]["methods"]
+    # Equal keyword scores: only the virtual clock's recency boost puts the newer article first
+    method, _, sources = reports[0]["responses"][0]
+    assert sources[:2] == ["https://replay.example.com/newer", "https://replay.example.com/older"]
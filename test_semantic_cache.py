@@ -0,0 +1,83 @@
+"""
+Checks for the semantic Gemini answer cache
+- Rephrasings of one question share a cached answer; unrelated questions miss
+- Answers built from articles that no longer match are dropped as stale
+- The byte budget evicts least-recently-used entries
+- Namespaces (tenant subscriptions) never share answers
+"""
+from semantic_cache import SemanticCache
+
+SOURCES = [f"https://example.com/ai/{n}" for n in range(5)]
+
+
+def test_rephrasings_hit_one_entry():
+    cache = SemanticCache()
+    cache.store("latest AI news", SOURCES, "AI answer", tokens=500)
+
+    for question in ("latest AI news", "what's new in AI today", "recent AI developments"):
+        assert cache.lookup(question, SOURCES) == "AI answer", question
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["hits"] == 3
+    assert stats["gemini_calls_avoided"] == 3
+    assert stats["tokens_avoided"] == 1500
+
+
+def test_unrelated_questions_miss():
+    cache = SemanticCache()
+    cache.store("latest AI news", SOURCES, "AI answer", tokens=500)
+
+    assert cache.lookup("latest crypto news", SOURCES) is None
+    assert cache.lookup("Is Tesla stock down?", SOURCES) is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_low_source_overlap_is_stale_and_removed():
+    cache = SemanticCache(min_source_overlap=0.6)
+    cache.store("latest AI news", SOURCES, "AI answer", tokens=500)
+
+    # Two of five articles still match: overlap 2/8 is below the minimum
+    moved_on = SOURCES[:2] + [f"https://example.com/ai/new-{n}" for n in range(3)]
+    assert cache.lookup("recent AI developments", moved_on) is None
+
+    stats = cache.stats()
+    assert stats["stale"] == 1
+    assert stats["entries"] == 0
+    assert stats["bytes"] == 0
+    assert cache.lookup("latest AI news", SOURCES) is None
+
+
+def test_max_bytes_evicts_least_recently_used():
+    probe = SemanticCache()
+    probe.store("latest AI news", SOURCES, "x" * 1000, tokens=1)
+    entry_size = probe.stats()["bytes"]
+
+    cache = SemanticCache(max_bytes=int(entry_size * 2.5))
+    cache.store("latest AI news", SOURCES, "x" * 1000, tokens=1)
+    cache.store("latest crypto news", SOURCES, "y" * 1000, tokens=1)
+    # Touch the AI entry so crypto becomes least recently used
+    assert cache.lookup("recent AI developments", SOURCES) == "x" * 1000
+    cache.store("latest climate news", SOURCES, "z" * 1000, tokens=1)
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= cache.max_bytes
+    assert cache.lookup("latest crypto news", SOURCES) is None
+    assert cache.lookup("latest AI news", SOURCES) == "x" * 1000
+    assert cache.lookup("latest climate news", SOURCES) == "z" * 1000
+
+
+def test_namespaces_are_isolated():
+    cache = SemanticCache()
+    cache.store("latest AI news", SOURCES, "newsroom answer", tokens=500, namespace="newsroom")
+
+    assert cache.lookup("latest AI news", SOURCES) is None
+    assert cache.lookup("latest AI news", SOURCES, namespace="paris-desk") is None
+    assert cache.lookup("latest AI news", SOURCES, namespace="newsroom") == "newsroom answer"
+
+    cache.store("latest AI news", SOURCES, "paris answer", tokens=500, namespace="paris-desk")
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup("recent AI developments", SOURCES, namespace="paris-desk") == "paris answer"
+    assert cache.lookup("recent AI developments", SOURCES, namespace="newsroom") == "newsroom answer"
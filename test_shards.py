@@ -0,0 +1,140 @@
+"""
+Checks for the sharded article store
+- Sharded search ranks exactly like find_relevant_articles over the whole store
+- Tenant predicates are applied inside every shard
+- A missed deadline returns partial results instead of waiting, keeping the newest articles
+- Full shards waiting to be sealed are still searched
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import simple_app
+from article_shards import Query, ShardedArticleStore
+from bench_shards import synthetic_articles, QUESTIONS
+
+
+def _store(articles, shard_size=500):
+    store = ShardedArticleStore(simple_app.score_article, simple_app.article_fetch_time,
+                                simple_app.AUTHORITATIVE_SOURCES,
+                                timedelta(hours=simple_app.RECENCY_WINDOW_HOURS), shard_size, 4)
+    for article in articles:
+        store.add(article)
+    store.flush()
+    return store
+
+
+def _query(question, predicate=None):
+    return Query(question.lower(), simple_app.extract_keywords(question),
+                 simple_app.query_terms(question), simple_app.clock(), predicate)
+
+
+def setup_module():
+    # Same recency boosts for the sharded and linear paths
+    now = datetime.now()
+    simple_app.clock = lambda: now
+
+
+def teardown_module():
+    simple_app.clock = datetime.now
+
+
+def test_sharded_search_matches_linear_scan():
+    articles = list(synthetic_articles(3000))
+    store = _store(articles)
+    assert store.stats()["sealed_shards"] == 6
+    for question in QUESTIONS + ["What's new?", "Reuters"]:
+        result, partial = store.search(_query(question), limit=10)
+        expected = simple_app.find_relevant_articles(question, articles)
+        assert not partial
+        assert [a['url'] for a in result] == [a['url'] for a in expected], question
+
+
+def test_predicate_filters_every_shard():
+    articles = list(synthetic_articles(2000))
+    store = _store(articles)
+    only_ai = lambda article: article['category'] == 'ai'
+    question = "What are the latest AI developments?"
+    result, _ = store.search(_query(question, only_ai), limit=10)
+    expected = simple_app.find_relevant_articles(question, [a for a in articles if only_ai(a)])
+    assert [a['url'] for a in result] == [a['url'] for a in expected]
+
+
+def test_deadline_returns_partial_results():
+    release = threading.Event()
+
+    def slow_score(article, question_lower, keywords, now):
+        # Articles of the first shard take too long to score
+        if int(article['url'].rsplit('-', 1)[1]) < 500:
+            release.wait(5)
+        return simple_app.score_article(article, question_lower, keywords, now)
+
+    articles = list(synthetic_articles(1500))
+    store = _store(articles)
+    store.score_fn = slow_score
+    try:
+        result, partial = store.search(_query("How is the stock market doing today?"), limit=10, deadline=0.2)
+    finally:
+        release.set()
+    assert partial
+    assert all(int(a['url'].rsplit('-', 1)[1]) >= 500 for a in result)
+    assert store.stats()["partial_queries"] == 1
+
+
+def test_full_shards_are_searchable_before_sealing():
+    articles = list(synthetic_articles(1200))
+    store = ShardedArticleStore(simple_app.score_article, simple_app.article_fetch_time,
+                                simple_app.AUTHORITATIVE_SOURCES,
+                                timedelta(hours=simple_app.RECENCY_WINDOW_HOURS), 500, 4)
+    # Hold the sealer so both full shards are still unsealed heads
+    gate = threading.Event()
+    store._sealer = ThreadPoolExecutor(max_workers=1)
+    store._sealer.submit(gate.wait, 5)
+    for article in articles:
+        store.add(article)
+    assert store.stats()["pending_seals"] == 2
+
+    question = "What are the latest AI developments?"
+    expected = [a['url'] for a in simple_app.find_relevant_articles(question, articles)]
+    result, _ = store.search(_query(question), limit=10)
+    assert [a['url'] for a in result] == expected
+    gate.set()
+    store.flush()
+    assert store.stats()["sealed_shards"] == 2
+    result, _ = store.search(_query(question), limit=10)
+    assert [a['url'] for a in result] == expected
+
+
+def _newest_wins(article, question_lower, keywords, now):
+    # Slow scorer that ranks newer articles higher
+    time.sleep(0.002)
+    return int(article['url'].rsplit('-', 1)[1]) + 1
+
+
+def test_deadline_keeps_newest_shards():
+    articles = list(synthetic_articles(1600))
+    store = ShardedArticleStore(_newest_wins, simple_app.article_fetch_time, shard_size=100, workers=1)
+    for article in articles:
+        store.add(article)
+    store.flush()
+    assert store.stats()["sealed_shards"] == 16
+
+    # "term" hits nearly every article, so each shard takes ~0.2 s to score
+    query = Query("term", [], ["term"], simple_app.clock())
+    result, partial = store.search(query, limit=10, deadline=0.3)
+    assert partial
+    assert [a['url'] for a in result] == [a['url'] for a in reversed(articles[-10:])]
+
+
+def test_deadline_applies_to_a_single_shard():
+    articles = list(synthetic_articles(1000))
+    store = ShardedArticleStore(_newest_wins, simple_app.article_fetch_time, shard_size=10000)
+    for article in articles:
+        store.add(article)
+
+    started = time.monotonic()
+    result, partial = store.search(_query("What's new?"), limit=10, deadline=0.1)
+    assert time.monotonic() - started < 1
+    assert partial
+    assert [a['url'] for a in result] == [a['url'] for a in reversed(articles[-10:])]
+    assert store.stats()["partial_queries"] == 1
@@ -0,0 +1,227 @@
+"""
+Load test for the /api/stream broadcaster
+- Fans events out to 1k simulated subscribers and measures latency and memory
+- Checks that slow subscribers are dropped and resume-from-Last-Event-ID works
+- Checks that a dashboard snapshot plus its last_event_id misses no batch
+- Checks that articles preloaded at startup reach already-open dashboards
+"""
+import sys
+import time
+import threading
+import tracemalloc
+from news_stream import Broadcaster
+
+SUBSCRIBERS = 1000
+EVENTS = 20
+
+
+def _sample_batch(n):
+    return {
+        "articles": [
+            {
+                "title": f"Sample headline number {i}",
+                "source": "Reuters",
+                "topic": "technology",
+                "category": "ai",
+                "published_at": "2024-01-01T00:00:00Z",
+                "url": f"https://example.com/{n}/{i}"
+            }
+            for i in range(10)
+        ],
+        "total": n * 10
+    }
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_fanout(subscribers=SUBSCRIBERS, events=EVENTS):
+    """Broadcast events to many consumer threads; return latency/memory report"""
+    broadcaster = Broadcaster(buffer_size=events + 1)
+
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    subs = [broadcaster.subscribe() for _ in range(subscribers)]
+    memory_subscribed = tracemalloc.get_traced_memory()[0]
+
+    publish_times = {}
+    latencies = []
+    received = [0] * subscribers
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(subscribers + 1)
+
+    def consume(index, subscriber):
+        start_barrier.wait()
+        local = []
+        for _ in range(events):
+            message = subscriber.queue.get(timeout=10)
+            now = time.perf_counter()
+            event_id = int(message.split(b"\n", 1)[0].rsplit(b"-", 1)[1])
+            local.append(now - publish_times[event_id])
+        received[index] = len(local)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=consume, args=(i, s), daemon=True) for i, s in enumerate(subs)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+
+    publish_costs = []
+    for n in range(1, events + 1):
+        started = time.perf_counter()
+        publish_times[n] = started
+        broadcaster.publish("articles", _sample_batch(n))
+        publish_costs.append(time.perf_counter() - started)
+
+    for thread in threads:
+        thread.join(timeout=30)
+
+    memory_after, memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "subscribers": subscribers,
+        "events": events,
+        "delivered": sum(received),
+        "dropped": broadcaster.dropped_count,
+        "publish_ms_avg": sum(publish_costs) / len(publish_costs) * 1000,
+        "publish_ms_max": max(publish_costs) * 1000,
+        "latency_ms_p50": _percentile(latencies, 50) * 1000,
+        "latency_ms_p99": _percentile(latencies, 99) * 1000,
+        "memory_per_subscriber_bytes": (memory_subscribed - memory_before) / subscribers,
+        "memory_peak_kb": memory_peak / 1024,
+        "memory_retained_kb": (memory_after - memory_before) / 1024
+    }
+
+
+def test_fanout_1k_subscribers():
+    report = run_fanout()
+    assert report["delivered"] == SUBSCRIBERS * EVENTS
+    assert report["dropped"] == 0
+    # Fan-out must stay cheap: one encode plus a non-blocking put per subscriber
+    assert report["publish_ms_max"] < 1000
+
+
+def test_slow_subscriber_is_dropped():
+    broadcaster = Broadcaster(buffer_size=4)
+    slow = broadcaster.subscribe()
+    fast = broadcaster.subscribe()
+
+    for n in range(10):
+        broadcaster.publish("stats", {"n": n})
+        # The fast client keeps up, the slow one never reads
+        fast.queue.get_nowait()
+
+    assert slow.dropped
+    assert not fast.dropped
+    assert broadcaster.subscriber_count == 1
+    assert broadcaster.dropped_count == 1
+
+
+def test_resume_from_last_event_id():
+    broadcaster = Broadcaster(buffer_size=16, history_size=8, epoch="100")
+    for n in range(5):
+        broadcaster.publish("stats", {"n": n})
+
+    resumed = broadcaster.subscribe(last_event_id="100-3")
+    ids = [resumed.queue.get_nowait().split(b"\n", 1)[0] for _ in range(resumed.queue.qsize())]
+    assert ids == [b"id: 100-4", b"id: 100-5"]
+
+    # Up to date: nothing to replay
+    current = broadcaster.subscribe(last_event_id="100-5")
+    assert current.queue.empty()
+
+    # Older than the history ring: client must reload
+    for n in range(20):
+        broadcaster.publish("stats", {"n": n})
+    stale = broadcaster.subscribe(last_event_id="100-2")
+    assert b"event: resync" in stale.queue.get_nowait()
+
+
+def test_restart_forces_resync():
+    # A new process counts from 1 again; an id from the old one must not resume
+    restarted = Broadcaster(epoch="200")
+    for n in range(6):
+        restarted.publish("stats", {"n": n})
+    for last_event_id in ("100-3", "3", "junk"):
+        subscriber = restarted.subscribe(last_event_id=last_event_id)
+        assert subscriber.queue.qsize() == 1
+        assert b"event: resync" in subscriber.queue.get_nowait()
+    assert restarted.subscribe(last_event_id="200-6").queue.empty()
+
+
+def test_snapshot_resume_misses_no_batch():
+    import contextlib
+    import io
+    import simple_app
+
+    def raw(n):
+        return [{"title": f"Snapshot test headline {n}", "url": f"https://example.com/snapshot/{n}",
+                 "source": {"name": "Reuters"}}]
+
+    client = simple_app.app.test_client()
+    with contextlib.redirect_stdout(io.StringIO()):
+        simple_app.commit_batch(raw(1), "technology", "en", "us")
+        articles = client.get('/api/articles').get_json()
+        stats = client.get('/api/stats').get_json()
+        assert articles["last_event_id"] == stats["last_event_id"] == simple_app.broadcasters[simple_app.DEFAULT_TENANT].last_event_id
+
+        # Subscribing from the snapshot replays nothing it already contains...
+        subscriber = simple_app.broadcasters[simple_app.DEFAULT_TENANT].subscribe(str(articles["last_event_id"]))
+        assert subscriber.queue.empty()
+
+        # ...and every later batch arrives
+        simple_app.commit_batch(raw(2), "technology", "en", "us")
+    events = [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+    assert [event.split(b"\n")[1] for event in events] == [b"event: articles", b"event: stats"]
+    assert b"snapshot/2" in events[0]
+    simple_app.broadcasters[simple_app.DEFAULT_TENANT].unsubscribe(subscriber)
+
+
+def test_preloaded_window_is_published(tmp_path, monkeypatch):
+    import contextlib
+    import gzip
+    import io
+    import json
+    import simple_app
+
+    path = str(tmp_path / "window.json.gz")
+    window = [{"title": "Preloaded headline", "description": "", "content": "", "source": "Reuters",
+               "url": "https://example.com/window/1", "topic": "technology", "category": "general",
+               "published_at": "", "fetched_at": simple_app.clock().isoformat(), "lang": "en", "country": "us"}]
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(window, f)
+    monkeypatch.setattr(simple_app, "ARTICLE_WINDOW_PATH", path)
+
+    broadcaster = simple_app.broadcasters[simple_app.DEFAULT_TENANT]
+    subscriber = broadcaster.subscribe()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert simple_app.load_article_window()
+    events = [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+    broadcaster.unsubscribe(subscriber)
+    assert [event.split(b"\n")[1] for event in events] == [b"event: articles", b"event: stats"]
+    assert b"window/1" in events[0]
+
+if __name__ == "__main__":
+    subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else SUBSCRIBERS
+
+    print("\n" + "=" * 60)
+    print("Live News Analyst - Stream Fan-out Test")
+    print("=" * 60)
+
+    report = run_fanout(subscribers=subscribers)
+    print(f"\n📡 Subscribers: {report['subscribers']} | Events: {report['events']}")
+    print(f"   Delivered: {report['delivered']} | Dropped: {report['dropped']}")
+    print(f"\n⏱️  Publish cost: avg {report['publish_ms_avg']:.2f} ms, max {report['publish_ms_max']:.2f} ms")
+    print(f"   Delivery latency: p50 {report['latency_ms_p50']:.2f} ms, p99 {report['latency_ms_p99']:.2f} ms")
+    print(f"\n💾 Memory per subscriber: {report['memory_per_subscriber_bytes']:.0f} bytes")
+    print(f"   Peak traced: {report['memory_peak_kb']:.0f} KB | Retained: {report['memory_retained_kb']:.0f} KB")
+
+    test_slow_subscriber_is_dropped()
+    test_resume_from_last_event_id()
+    test_restart_forces_resync()
+    print("\n✅ Slow-subscriber drop and Last-Event-ID resume checks passed")
+    print("=" * 60 + "\n")
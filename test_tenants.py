@@ -0,0 +1,164 @@
+"""
+Checks for multi-tenant subscriptions
+- Tenant configs are normalized and malformed ones rejected
+- FeedIndex merges feeds newest first, deduplicates and keeps store order
+- Running per-tenant counts match a full rescan of the view
+- Each tenant's stream and snapshots only carry articles in its view
+"""
+import contextlib
+import io
+import json
+import types
+from collections import Counter
+import pytest
+import simple_app
+from news_stream import Broadcaster
+from tenants import DEFAULT_TENANT, FeedIndex, Tenant, fetch_plan, load_tenants
+
+TECH = ("technology", "en", "us")
+SCIENCE = ("science", "en", "us")
+FRENCH = ("business", "fr", "fr")
+
+
+def _article(n, category="general"):
+    return {"url": f"https://example.com/tenants/{n}", "title": f"Headline {n}", "category": category}
+
+
+def test_load_tenants_normalizes_categories():
+    tenants = load_tenants('{"paris": {"topics": "business", "lang": "fr", "country": "fr", "categories": "business"}}',
+                           ["technology"])
+    paris = tenants["paris"]
+    assert paris.feeds == {FRENCH}
+    assert paris.categories == {"business"}
+    assert paris.accepts({"category": "business"})
+    assert not paris.accepts({"category": "technology"})
+    assert tenants[DEFAULT_TENANT].categories is None
+    assert fetch_plan(tenants) == sorted([FRENCH, ("technology", "en", "us")])
+
+
+def test_load_tenants_rejects_bad_specs():
+    with pytest.raises(ValueError):
+        load_tenants('["newsroom"]', ["technology"])
+    with pytest.raises(ValueError):
+        load_tenants('{"newsroom": "technology"}', ["technology"])
+    with pytest.raises(ValueError):
+        load_tenants('{"newsroom": {"topics": []}}', ["technology"])
+
+
+def test_feed_index_merges_dedupes_and_keeps_store_order():
+    index = FeedIndex()
+    articles = [_article(n) for n in range(5)]
+    index.add(TECH, articles[0])
+    index.add(SCIENCE, articles[1])
+    index.add(TECH, articles[2])
+    index.add(SCIENCE, articles[3])
+    # Stored earlier from science, later also carried by the tech feed
+    assert index.add(TECH, articles[1])
+    assert not index.add(TECH, articles[1])
+    index.add(TECH, articles[4])
+
+    both = Tenant("both", ["technology", "science"], ["en"], ["us"])
+    tech = Tenant("tech", ["technology"], ["en"], ["us"])
+    assert [a["url"] for a in index.view(both)] == [articles[n]["url"] for n in (4, 3, 2, 1, 0)]
+    # insort keeps the tech list in store order, not arrival order
+    assert [a["url"] for a in index.view(tech)] == [articles[n]["url"] for n in (4, 2, 1, 0)]
+    assert [a["url"] for a in index.view(both, limit=2)] == [articles[4]["url"], articles[3]["url"]]
+    assert index.feeds_for(articles[1]) == {TECH, SCIENCE}
+
+
+def test_view_and_new_for_apply_category_filter():
+    index = FeedIndex()
+    ai, business = _article(1, "ai"), _article(2, "business")
+    index.add(TECH, ai)
+    index.add(TECH, business)
+
+    business_only = Tenant("biz", ["technology"], ["en"], ["us"], ["business"])
+    assert index.view(business_only) == [business]
+    assert index.new_for(business_only, [ai, business], TECH) == [business]
+
+    # An article carried by a second feed is only new to tenants that didn't already have it
+    index.add(SCIENCE, ai)
+    science = Tenant("science", ["science"], ["en"], ["us"])
+    both = Tenant("both", ["technology", "science"], ["en"], ["us"])
+    assert index.new_for(science, [], SCIENCE, [ai]) == [ai]
+    assert index.new_for(both, [], SCIENCE, [ai]) == []
+
+
+def test_limited_view_matches_full_view():
+    index = FeedIndex()
+    # Mostly tech, with science articles interleaved every tenth seq
+    for n in range(400):
+        index.add(SCIENCE if n % 10 == 0 else TECH, _article(n, "ai" if n % 3 else "business"))
+    both = Tenant("both", ["technology", "science"], ["en"], ["us"])
+    business = Tenant("biz", ["technology", "science"], ["en"], ["us"], ["business"])
+    for tenant in (both, business):
+        full = index.view(tenant)
+        for limit in (1, 10, 50, 200, 500):
+            assert index.view(tenant, limit) == full[:limit]
+
+
+def test_view_counts_track_the_view():
+    both = Tenant("both", ["technology", "science"], ["en"], ["us"])
+    science = Tenant("science", ["science"], ["en"], ["us"], ["ai"])
+    index = FeedIndex([both, science])
+    articles = [dict(_article(n, "ai" if n % 2 else "business"), topic="technology", source=f"S{n % 3}",
+                     fetched_at=f"t{n}") for n in range(6)]
+    for article in articles:
+        index.add(TECH, article)
+    # Carried by a second feed: new to science only, and older than its newest article
+    index.add(SCIENCE, articles[5])
+    index.add(SCIENCE, articles[1])
+
+    for tenant in (both, science):
+        view = index.view(tenant)
+        counts = index.counts(tenant)
+        assert counts.total == len(view)
+        assert counts.by_category == Counter(a["category"] for a in view)
+        assert counts.by_source == Counter(a["source"] for a in view)
+        assert counts.last_updated == view[0]["fetched_at"]
+    assert index.counts(science).total == 2
+
+
+def test_stream_and_snapshots_are_per_tenant(monkeypatch):
+    tenants = load_tenants('{"paris": {"topics": ["business"], "lang": "fr", "country": "fr"}}',
+                           simple_app.NEWS_TOPICS)
+    monkeypatch.setattr(simple_app, "tenants", tenants)
+    monkeypatch.setattr(simple_app, "all_feeds", frozenset(fetch_plan(tenants)))
+    monkeypatch.setattr(simple_app, "broadcasters", {name: Broadcaster() for name in tenants})
+    monkeypatch.setattr(simple_app, "feed_index", FeedIndex(tenants.values()))
+    # French business is outside the default tenant's feeds: nobody sees the whole store
+    assert not simple_app.digests_servable()
+
+    default = simple_app.broadcasters[DEFAULT_TENANT].subscribe()
+    paris = simple_app.broadcasters["paris"].subscribe()
+    raw = [{"title": "Les marchés européens progressent", "url": "https://example.fr/tenants/marches",
+            "source": {"name": "Les Echos"}}]
+    with contextlib.redirect_stdout(io.StringIO()):
+        simple_app.commit_batch(raw, "business", "fr", "fr")
+
+    assert default.queue.empty()
+    events = [paris.queue.get_nowait() for _ in range(paris.queue.qsize())]
+    assert [event.split(b"\n")[1] for event in events] == [b"event: articles", b"event: stats"]
+    assert b"example.fr/tenants/marches" in events[0]
+    stats = json.loads(events[1].split(b"data: ", 1)[1])
+    assert stats["total_articles"] == 1
+
+    client = simple_app.app.test_client()
+    default_articles = client.get('/api/articles').get_json()
+    assert all("example.fr" not in a["url"] for a in default_articles["articles"])
+    assert default_articles["last_event_id"] == simple_app.broadcasters[DEFAULT_TENANT].last_event_id
+    assert default_articles["last_event_id"].endswith("-0")
+    paris_articles = client.get('/api/articles?tenant=paris').get_json()
+    assert paris_articles["total"] == 1
+    assert paris_articles["last_event_id"] == simple_app.broadcasters["paris"].last_event_id
+    assert paris_articles["last_event_id"].endswith("-2")
+    assert client.get('/api/stream?tenant=nobody').status_code == 404
+
+    # Prompts are recorded under the tenant however it was named
+    recorded = []
+    monkeypatch.setattr(simple_app, "recorder", types.SimpleNamespace(
+        record_prompt=lambda prompt, tenant=None: recorded.append(tenant)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        answer = client.post('/v1/pw_ai_answer?tenant=paris', json={"prompt": "Les marchés européens"}).get_json()
+    assert recorded == ["paris"]
+    assert [source["url"] for source in answer["sources"]] == ["https://example.fr/tenants/marches"]